@@ -5,17 +5,55 @@ Main Flask Application
 
 import os
 import shutil
-from flask import Flask, request, render_template, jsonify, send_file
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Request, request, render_template, jsonify, send_file
+from werkzeug.formparser import FormDataParser, MultiPartParser
 from werkzeug.utils import secure_filename
 import pandas as pd
 from datetime import datetime
 from processors.strict_pdf_processor import process_pdf_strict
-from processors.excel_builder import build_master_workbook
+from processors.excel_builder import build_master_workbook, REQUIRED_COLUMNS, CATEGORY_COLUMNS
 from processors.csv_processor import process_csv
 from processors.excel_processor import process_excel
 from processors.deduplicator import append_to_master_excel
 
+# Uploads are read/copied in large chunks and spooled to disk past a few MB
+UPLOAD_BUFFER_SIZE = 1024 * 1024
+UPLOAD_SPOOL_SIZE = 4 * 1024 * 1024
+
+
+class StreamingFormDataParser(FormDataParser):
+    """Multipart parser that reads the request body in large chunks"""
+
+    def _parse_multipart(self, stream, mimetype, content_length, options):
+        parser = MultiPartParser(
+            stream_factory=self.stream_factory,
+            max_form_memory_size=self.max_form_memory_size,
+            max_form_parts=self.max_form_parts,
+            cls=self.cls,
+            buffer_size=UPLOAD_BUFFER_SIZE,
+        )
+        boundary = options.get('boundary', '').encode('ascii')
+        if not boundary:
+            raise ValueError('Missing boundary')
+        form, files = parser.parse(stream, boundary, content_length)
+        return stream, form, files
+
+
+class StreamingRequest(Request):
+    """Request that parses uploads with StreamingFormDataParser"""
+    form_data_parser_class = StreamingFormDataParser
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_SIZE, mode='rb+')
+
+
 app = Flask(__name__)
+app.request_class = StreamingRequest
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 app.config['ALLOWED_EXTENSIONS'] = {'pdf', 'csv', 'xlsx', 'xls'}
@@ -26,16 +64,48 @@ os.makedirs('output', exist_ok=True)
 os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], 'processed'), exist_ok=True)
 
 # Simple in-memory store for complaints across uploads (Step 5)
-COMPLAINTS = []
+MASTER_DF = pd.DataFrame(columns=REQUIRED_COLUMNS)
+
+# Guards MASTER_DF and the master workbook across concurrent upload jobs
+MASTER_LOCK = threading.Lock()
+
+# Upload jobs run here so requests return immediately
+EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+# Progress state for UI polling (Step 7), keyed by job_id.
+# Finished jobs are kept PROGRESS_TTL seconds after finishing, then pruned.
+# Entries are only read or changed while holding PROGRESS_LOCK.
+PROGRESS = {}
+PROGRESS_TTL = 10 * 60
+_FINISHED_AT = {}
+PROGRESS_LOCK = threading.Lock()
+
+
+def _new_progress():
+    """Initial progress state for a new upload job"""
+    return {
+        'state': 'running',         # running | completed | error
+        'total_pages': 0,
+        'current_page': 0,
+        'message': 'Preparing file...',
+        'download_ready': False
+    }
+
+
+def _update_progress(progress, fields):
+    """Apply progress changes atomically with respect to /progress polling"""
+    with PROGRESS_LOCK:
+        progress.update(fields)
+
 
-# Progress state for UI polling (Step 7)
-PROGRESS = {
-    'state': 'idle',            # idle | running | completed | error
-    'total_pages': 0,
-    'current_page': 0,
-    'message': '',
-    'download_ready': False
-}
+def _prune_progress():
+    """Drop jobs that finished more than PROGRESS_TTL seconds ago"""
+    cutoff = time.monotonic() - PROGRESS_TTL
+    with PROGRESS_LOCK:
+        for job_id, finished_at in list(_FINISHED_AT.items()):
+            if finished_at < cutoff:
+                _FINISHED_AT.pop(job_id, None)
+                PROGRESS.pop(job_id, None)
 
 
 def allowed_file(filename):
@@ -44,6 +114,48 @@ def allowed_file(filename):
            filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
 
 
+def _df_to_complaints(df):
+    """Map a CSV/Excel DataFrame to complaint dicts with the required fields"""
+    df = df.reindex(columns=REQUIRED_COLUMNS)
+    for col in REQUIRED_COLUMNS:
+        if col == 'Amount_Lost':
+            # Keep amounts as read; only blank out missing cells
+            df[col] = df[col].astype(object).where(df[col].notna(), '')
+        else:
+            df[col] = df[col].fillna('').astype(str).str.strip()
+    return df.to_dict('records')
+
+
+def _read_csv(filepath):
+    """Read only the required columns of a CSV, as text"""
+    # dtype=str makes the C parser keep cells verbatim (leading zeros in mobile
+    # numbers) and leave blanks as NaN, which _df_to_complaints turns into ''
+    usecols = lambda c: c in REQUIRED_COLUMNS
+    dtype = {c: str for c in REQUIRED_COLUMNS if c != 'Amount_Lost'}
+    return pd.read_csv(filepath, usecols=usecols, dtype=dtype)
+
+
+def _read_excel(filepath):
+    """Read only the required columns of an Excel file (calamine reader when available)"""
+    usecols = lambda c: c in REQUIRED_COLUMNS
+    try:
+        return pd.read_excel(filepath, engine='calamine', usecols=usecols)
+    except (ImportError, ValueError):
+        return pd.read_excel(filepath, usecols=usecols)
+
+
+def _append_to_master(complaints_data):
+    """Append new complaints to MASTER_DF, keeping low-cardinality columns categorical"""
+    global MASTER_DF
+    new_df = pd.DataFrame(complaints_data).reindex(columns=REQUIRED_COLUMNS).fillna('')
+    if MASTER_DF.empty:
+        MASTER_DF = new_df
+    else:
+        MASTER_DF = pd.concat([MASTER_DF, new_df], ignore_index=True)
+    for col in CATEGORY_COLUMNS:
+        MASTER_DF[col] = MASTER_DF[col].astype('category')
+
+
 @app.route('/')
 def index():
     """Render main upload page"""
@@ -52,7 +164,7 @@ def index():
 
 @app.route('/upload', methods=['POST'])
 def upload_file():
-    """Handle file upload and processing"""
+    """Handle file upload; processing runs in the background (poll /progress)"""
     try:
         # STEP 1: File handling — save before processing
         if 'file' not in request.files:
@@ -69,24 +181,51 @@ def upload_file():
                 'message': 'Invalid file type. Allowed: PDF, CSV, XLSX'
             }), 400
         
-        # Save uploaded file (temporary local folder)
+        # Save uploaded file (temporary local folder); job prefix keeps
+        # concurrent uploads of the same filename apart
+        job_id = uuid.uuid4().hex
         filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-        
+        filepath = os.path.join(app.config['UPLOAD_FOLDER'], f"{job_id}_{filename}")
+        file.save(filepath, buffer_size=UPLOAD_BUFFER_SIZE)
+
+        _prune_progress()
+        with PROGRESS_LOCK:
+            PROGRESS[job_id] = _new_progress()
+        EXECUTOR.submit(_process_uploaded, job_id, filepath, filename)
+
+        return jsonify({
+            'success': True,
+            'message': 'File uploaded. Processing started.',
+            'job_id': job_id
+        }), 202
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error uploading file: {str(e)}'
+        }), 500
+
+
+def _process_uploaded(job_id, filepath, filename):
+    """Background job: extract complaints from a saved upload and rebuild the master Excel"""
+    with PROGRESS_LOCK:
+        progress = PROGRESS[job_id]
+    try:
         # Determine file type and process
         file_ext = filename.rsplit('.', 1)[1].lower()
         complaints_data = []
         
         if file_ext == 'pdf':
-            # Reset and start progress tracking
-            PROGRESS.update({'state': 'running', 'total_pages': 0, 'current_page': 0, 'message': 'Starting PDF analysis...', 'download_ready': False})
+            # Start progress tracking
+            _update_progress(progress, {'message': 'Starting PDF analysis...'})
 
             # Define a callback to update progress for each page
             def update_progress(current, total):
-                PROGRESS['total_pages'] = total
-                PROGRESS['current_page'] = current
-                PROGRESS['message'] = f"Analyzing page {current} of {total}"
+                _update_progress(progress, {
+                    'total_pages': total,
+                    'current_page': current,
+                    'message': f"Analyzing page {current} of {total}"
+                })
 
             # STEP 2-4: Strict PDF processing
             complaint = process_pdf_strict(filepath, update_progress)
@@ -94,61 +233,37 @@ def upload_file():
                 complaints_data = [complaint]
         elif file_ext == 'csv':
             # Basic CSV mapping to required fields (fallback)
-            df = pd.read_csv(filepath)
-            for _, row in df.iterrows():
-                complaints_data.append({
-                    'Complaint_ID': str(row.get('Complaint_ID', '')).strip(),
-                    'Complaint_Date_Time': str(row.get('Complaint_Date_Time', '')).strip(),
-                    'Complainant_Name': str(row.get('Complainant_Name', '')).strip(),
-                    'Mobile_Number': str(row.get('Mobile_Number', '')).strip(),
-                    'Email': str(row.get('Email', '')).strip(),
-                    'District': str(row.get('District', '')).strip(),
-                    'Police_Station': str(row.get('Police_Station', '')).strip(),
-                    'Type_of_Cybercrime': str(row.get('Type_of_Cybercrime', '')).strip(),
-                    'Platform_Involved': str(row.get('Platform_Involved', '')).strip(),
-                    'Amount_Lost': row.get('Amount_Lost', ''),
-                    'Current_Status': str(row.get('Current_Status', '')).strip(),
-                })
+            df = _read_csv(filepath)
+            complaints_data = _df_to_complaints(df)
         elif file_ext in ['xlsx', 'xls']:
             # Basic Excel mapping to required fields (fallback)
-            df = pd.read_excel(filepath)
-            for _, row in df.iterrows():
-                complaints_data.append({
-                    'Complaint_ID': str(row.get('Complaint_ID', '')).strip(),
-                    'Complaint_Date_Time': str(row.get('Complaint_Date_Time', '')).strip(),
-                    'Complainant_Name': str(row.get('Complainant_Name', '')).strip(),
-                    'Mobile_Number': str(row.get('Mobile_Number', '')).strip(),
-                    'Email': str(row.get('Email', '')).strip(),
-                    'District': str(row.get('District', '')).strip(),
-                    'Police_Station': str(row.get('Police_Station', '')).strip(),
-                    'Type_of_Cybercrime': str(row.get('Type_of_Cybercrime', '')).strip(),
-                    'Platform_Involved': str(row.get('Platform_Involved', '')).strip(),
-                    'Amount_Lost': row.get('Amount_Lost', ''),
-                    'Current_Status': str(row.get('Current_Status', '')).strip(),
-                })
+            df = _read_excel(filepath)
+            complaints_data = _df_to_complaints(df)
         else:
-            return jsonify({
-                'success': False, 
-                'message': 'Unsupported file type'
-            }), 400
+            _update_progress(progress, {'state': 'error', 'message': 'Unsupported file type'})
+            return
         
         if not complaints_data:
-            return jsonify({
-                'success': False, 
-                'message': 'No complaint data extracted from file'
-            }), 400
+            _update_progress(progress, {'state': 'error', 'message': 'No complaint data extracted from file'})
+            return
         
-        # STEP 5: Append to in-memory complaints (do NOT overwrite)
-        for c in complaints_data:
-            COMPLAINTS.append(c)
+        with MASTER_LOCK:
+            # STEP 5: Append to in-memory complaints (do NOT overwrite)
+            _append_to_master(complaints_data)
 
-        # STEP 6: Excel generation AFTER processing completes
-        output_path = os.path.join('output', 'ncrp_master.xlsx')
-        build_master_workbook(COMPLAINTS, output_path)
-        PROGRESS.update({'state': 'completed', 'message': 'Excel generated successfully.', 'download_ready': True})
+            # STEP 6: Excel generation AFTER processing completes
+            output_path = os.path.join('output', 'ncrp_master.xlsx')
+            build_master_workbook(MASTER_DF, output_path)
+            total_count = len(MASTER_DF)
 
         new_count = len(complaints_data)
-        total_count = len(COMPLAINTS)
+        _update_progress(progress, {
+            'state': 'completed',
+            'message': f'Successfully processed {new_count} new complaint(s). Total: {total_count}',
+            'download_ready': True,
+            'new_complaints': new_count,
+            'total_complaints': total_count
+        })
         
         # Archive uploaded file instead of deleting
         try:
@@ -158,26 +273,24 @@ def upload_file():
             shutil.move(filepath, archive_path)
         except Exception:
             pass
-        
-        return jsonify({
-            'success': True,
-            'message': f'Successfully processed {new_count} new complaint(s). Total: {total_count}',
-            'new_complaints': new_count,
-            'total_complaints': total_count
-        })
     
     except Exception as e:
-        PROGRESS.update({'state': 'error', 'message': f'Error: {str(e)}', 'download_ready': False})
-        return jsonify({
-            'success': False,
-            'message': f'Error processing file: {str(e)}'
-        }), 500
+        _update_progress(progress, {'state': 'error', 'message': f'Error processing file: {str(e)}', 'download_ready': False})
+    finally:
+        with PROGRESS_LOCK:
+            _FINISHED_AT[job_id] = time.monotonic()
 
 
 @app.route('/progress', methods=['GET'])
 def get_progress():
-    """Return current processing progress for UI polling"""
-    return jsonify(PROGRESS)
+    """Return processing progress of one upload job for UI polling"""
+    job_id = request.args.get('job_id', '')
+    with PROGRESS_LOCK:
+        progress = PROGRESS.get(job_id)
+        snapshot = dict(progress) if progress is not None else None
+    if snapshot is None:
+        return jsonify({'success': False, 'message': 'Unknown job_id'}), 404
+    return jsonify(snapshot)
 
 
 @app.route('/download/master', methods=['GET'])
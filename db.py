@@ -1,10 +1,16 @@
 import os
+import threading
 from pymongo import MongoClient
 
 MONGODB_URI = os.getenv("MONGODB_URI")
 DB_NAME = os.getenv("DB_NAME", "ncrp_database")
 
-def get_db():
+_client = None
+_lock = threading.Lock()
+
+
+def _init():
+    global _client
     if not MONGODB_URI:
         raise RuntimeError("MONGODB_URI not configured")
 
@@ -12,5 +18,17 @@ def get_db():
         MONGODB_URI,
         serverSelectionTimeoutMS=5000
     )
-    client.admin.command("ping")  # force connect
-    return client[DB_NAME]
+    try:
+        client.admin.command("ping")  # force connect (once per process)
+    except Exception:
+        client.close()  # stop its monitor threads; next get_db() retries
+        raise
+    _client = client
+
+
+def get_db():
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _init()
+    return _client[DB_NAME]
@@ -383,10 +383,7 @@ def append_to_master_excel(complaints: List[Dict], source_file_type: str) -> Tup
     enhanced_complaints = apply_intelligence_features(complaints)
     
     # Build rows using fixed schema - explicit extraction
-    new_rows = []
-    for complaint in enhanced_complaints:
-        row = build_row_from_complaint(complaint, source_file_type)
-        new_rows.append(row)
+    new_rows = [build_row_from_complaint(complaint, source_file_type) for complaint in enhanced_complaints]
     
     # Create DataFrame using POSITIONAL MAPPING ONLY
     # This is the MANDATORY approach - no dictionary-based creation
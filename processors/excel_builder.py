@@ -5,13 +5,13 @@ Excel Builder for Master Workbook (STEP 6)
 - Adds Platform-wise sheets (grouped by Platform_Involved)
 - Adds Possible Duplicates sheet (flag only; no merge)
 
-Beginner-friendly comments: explains pandas + openpyxl usage.
+Beginner-friendly comments: explains pandas + xlsxwriter usage.
 """
 
 import os
+import numpy as np
 import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.utils.dataframe import dataframe_to_rows
+import xlsxwriter
 
 REQUIRED_COLUMNS = [
     'Complaint_ID',
@@ -27,80 +27,96 @@ REQUIRED_COLUMNS = [
     'Current_Status',
 ]
 
+# Few distinct values across many complaints: stored as pandas 'category' dtype
+CATEGORY_COLUMNS = [
+    'Type_of_Cybercrime',
+    'Platform_Involved',
+    'District',
+    'Current_Status',
+    'Police_Station',
+]
+
 
 def _ensure_columns(df: pd.DataFrame) -> pd.DataFrame:
     """Ensure all required columns exist, filling blanks as needed."""
-    for col in REQUIRED_COLUMNS:
-        if col not in df.columns:
-            df[col] = ''
-    return df[REQUIRED_COLUMNS]
+    return df.reindex(columns=REQUIRED_COLUMNS, fill_value='')
 
 
-def _grouped_sheet(wb, name: str, df: pd.DataFrame, by: str):
+def _write_sheet(workbook, name: str, df: pd.DataFrame):
     """
-    Create a grouped sheet where each group's rows are written sequentially.
-    Example: Crime-type-wise or Platform-wise.
+    Write a DataFrame to a new sheet: header row first, then one row per complaint.
+    Rows are streamed in order, as constant_memory mode requires.
     """
-    ws = wb.create_sheet(title=name)
-    # Write a header row
-    ws.append(REQUIRED_COLUMNS)
-    # Sort by grouping column for readability
-    df_sorted = df.sort_values(by=[by, 'Complaint_ID'])
-    for row in dataframe_to_rows(df_sorted[REQUIRED_COLUMNS], index=False, header=False):
-        ws.append(row)
+    ws = workbook.add_worksheet(name)
+    ws.write_row(0, 0, list(df.columns))
+    for r, row in enumerate(df.itertuples(index=False, name=None), start=1):
+        ws.write_row(r, 0, row)
 
 
-def _duplicates_sheet(wb, df: pd.DataFrame):
+def _grouped_df(df: pd.DataFrame, by: str) -> pd.DataFrame:
     """
-    Build a sheet listing possible duplicates.
-    Rule: same Complaint_ID or same Mobile_Number appear more than once.
+    Return rows ordered so each group's rows are written sequentially.
+    Example: Crime-type-wise or Platform-wise.
     """
-    ws = wb.create_sheet(title='Possible_Duplicates')
-    ws.append(REQUIRED_COLUMNS + ['Duplicate_Reason'])
+    # Sort by grouping column, then Complaint_ID, for readability.
+    # MASTER_DF keeps group columns categorical (categories sorted), so the
+    # primary key can use its integer codes directly without re-factorizing.
+    if isinstance(df[by].dtype, pd.CategoricalDtype):
+        order = np.lexsort((df['Complaint_ID'].to_numpy(), df[by].cat.codes.to_numpy()))
+        return df.iloc[order]
+    return df.sort_values(by=[by, 'Complaint_ID'])
 
-    # Find duplicates by Complaint_ID or Mobile_Number
-    dup_id = df[df['Complaint_ID'].astype(str).str.len() > 0]
-    dup_id = dup_id[dup_id['Complaint_ID'].duplicated(keep=False)]
-    dup_id['Duplicate_Reason'] = 'Duplicate Complaint_ID'
 
-    dup_mobile = df[df['Mobile_Number'].astype(str).str.len() > 0]
-    dup_mobile = dup_mobile[dup_mobile['Mobile_Number'].duplicated(keep=False)]
-    dup_mobile['Duplicate_Reason'] = 'Duplicate Mobile_Number'
+def _duplicates_df(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Build the rows for the possible duplicates sheet.
+    Rule: same Complaint_ID or same Mobile_Number appear more than once.
+    A row matching both rules is listed once with a combined reason.
+    """
+    # Flag duplicates by Complaint_ID or Mobile_Number in one vectorized pass
+    id_mask = df['Complaint_ID'].astype(str).ne('') & df.duplicated(subset='Complaint_ID', keep=False)
+    mob_mask = df['Mobile_Number'].astype(str).ne('') & df.duplicated(subset='Mobile_Number', keep=False)
+    any_mask = id_mask | mob_mask
 
-    dup_df = pd.concat([dup_id, dup_mobile], ignore_index=True)
-    if not dup_df.empty:
-        for row in dataframe_to_rows(dup_df[REQUIRED_COLUMNS + ['Duplicate_Reason']], index=False, header=False):
-            ws.append(row)
+    reason = np.where(
+        id_mask & mob_mask, 'Duplicate Complaint_ID & Mobile_Number',
+        np.where(id_mask, 'Duplicate Complaint_ID', 'Duplicate Mobile_Number')
+    )
+    return df.loc[any_mask, REQUIRED_COLUMNS].assign(Duplicate_Reason=reason[any_mask.to_numpy()])
 
 
-def build_master_workbook(complaints: list, output_path: str):
+def build_master_workbook(df: pd.DataFrame, output_path: str):
     """
     STEP 6: After all files are processed, build the Excel workbook.
     - Master Sheet: all complaints
     - Crime-type-wise sheets
     - Platform-wise sheets
     - Possible duplicates sheet
+
+    Takes the master complaints DataFrame (one row per complaint).
     """
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-    # Convert complaints list (list of dicts) to DataFrame
-    df = pd.DataFrame(complaints)
     df = _ensure_columns(df)
 
-    # Write initial workbook with pandas
-    df.to_excel(output_path, index=False, sheet_name='Master')
-
-    # Load with openpyxl to add more sheets
-    wb = load_workbook(output_path)
+    # Blank out missing cells once; xlsxwriter cannot write NaN.
+    # Categorical columns are left as-is so sorting stays on category codes.
+    for col in df.columns:
+        if not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object).where(df[col].notna(), '')
 
-    # Crime-type-wise sheet
-    _grouped_sheet(wb, 'By_Crime_Type', df, 'Type_of_Cybercrime')
+    # Stream every sheet row by row in constant memory with xlsxwriter
+    workbook = xlsxwriter.Workbook(output_path, {'constant_memory': True})
+    try:
+        _write_sheet(workbook, 'Master', df)
 
-    # Platform-wise sheet
-    _grouped_sheet(wb, 'By_Platform', df, 'Platform_Involved')
+        # Crime-type-wise sheet
+        _write_sheet(workbook, 'By_Crime_Type', _grouped_df(df, 'Type_of_Cybercrime'))
 
-    # Possible duplicates sheet
-    _duplicates_sheet(wb, df)
+        # Platform-wise sheet
+        _write_sheet(workbook, 'By_Platform', _grouped_df(df, 'Platform_Involved'))
 
-    # Save workbook
-    wb.save(output_path)
+        # Possible duplicates sheet
+        _write_sheet(workbook, 'Possible_Duplicates', _duplicates_df(df))
+    finally:
+        workbook.close()
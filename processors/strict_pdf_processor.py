@@ -10,32 +10,60 @@ Follows STEP 2–4 exactly as requested:
 Beginner-friendly comments included throughout.
 """
 
-import pdfplumber
+import hashlib
+import os
 import re
-from typing import Callable, Dict, List
-
-# Helper: safely extract using label patterns
-def _extract_after_label(text: str, label_patterns: List[str]) -> str:
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import pdfplumber
+import pypdfium2 as pdfium
+from typing import Callable, Dict, List, Pattern
+
+# Label alternatives per field (labels vary between NCRP exports)
+FIELD_LABELS: Dict[str, List[str]] = {
+    'Complaint_ID': [r"Acknowledgement\s*Number", r"Complaint\s*ID", r"Ack\s*No"],
+    'Complaint_Date_Time': [r"Complaint\s*Date\s*\/?\s*Time", r"Complaint\s*Date", r"Registration\s*Date"],
+    'Complainant_Name': [r"Complainant\s*Name", r"Name\s*of\s*Complainant"],
+    'Mobile_Number': [r"Mobile\s*Number", r"Mobile\s*No", r"Phone\s*Number"],
+    'Email': [r"Email", r"E\-?mail"],
+    'District': [r"District"],
+    'Police_Station': [r"Police\s*Station", r"PS\s*Name"],
+    'Type_of_Cybercrime': [r"Type\s*of\s*Cyber\s*Crime", r"Category\s*of\s*complaint"],
+    'Platform_Involved': [r"Platform\s*involved", r"Bank\/Platform", r"Platform"],
+    'Amount_Lost': [r"Amount\s*Lost", r"Total\s*Fraudulent\s*Amount", r"Loss\s*Amount"],
+    'Current_Status': [r"Status", r"Current\s*Status"],
+}
+
+# Compile once at import: "Label: value" or label with the value on the next line
+FIELD_PATTERNS: Dict[str, List[Pattern]] = {
+    field: [
+        re.compile(rf"{lbl}\s*(?::|\n)\s*([^\n]+)", re.IGNORECASE | re.MULTILINE)
+        for lbl in labels
+    ]
+    for field, labels in FIELD_LABELS.items()
+}
+
+
+# Helper: safely extract using precompiled label patterns
+def _extract_after_label(text: str, patterns: List[Pattern]) -> str:
     """
-    Searches for any of the provided label patterns (case-insensitive).
-    If found, captures the text immediately following the label up to the end of line.
+    Tries each compiled label pattern in order.
+    If found, returns the text immediately following the label up to the end of line.
     Returns an empty string if not found.
     """
-    for lbl in label_patterns:
-        # Match like: "Label: value" or on next line
-        pattern_inline = rf"{lbl}\s*:\s*(.+)"
-        pattern_nextline = rf"{lbl}\s*\n\s*(.+)"
-        m = re.search(pattern_inline, text, re.IGNORECASE)
-        if not m:
-            m = re.search(pattern_nextline, text, re.IGNORECASE)
+    for p in patterns:
+        m = p.search(text)
         if m:
-            # Only take first line; strip spaces
-            value = m.group(1).strip()
-            if "\n" in value:
-                value = value.split("\n")[0].strip()
-            return value
+            return m.group(1).strip()
     return ""
 
+
+# Helper: extract every field with its precompiled patterns
+def _extract_fields(text: str) -> Dict[str, str]:
+    """Returns one value per field; missing fields are left as empty strings."""
+    return {field: _extract_after_label(text, patterns) for field, patterns in FIELD_PATTERNS.items()}
+
 # Helper: generic number/currency cleanup
 def _cleanup_amount(raw: str) -> str:
     if not raw:
@@ -46,111 +74,132 @@ def _cleanup_amount(raw: str) -> str:
     cleaned = cleaned.replace(",", "")
     return cleaned
 
+# Pages with fewer characters than this (blank, header/footer-only) are skipped
+MIN_PAGE_CHARS = 20
+
+# Recently processed PDFs keyed by file content hash, so re-uploads return instantly
+_RESULT_CACHE: "OrderedDict[str, Dict]" = OrderedDict()
+_RESULT_CACHE_SIZE = 32
+_RESULT_CACHE_LOCK = threading.Lock()
+
+# PDFium is not thread-safe; serialises every use of it in this process
+_PDFIUM_LOCK = threading.Lock()
+
+
+# Helper: content hash of a file (uploads get unique names, so the path is no key)
+def _file_digest(filepath: str) -> str:
+    h = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# Page text extraction (fast path): PDFium via pypdfium2
+def _extract_pages_pdfium(filepath: str, update_progress: Callable[[int, int], None] = None) -> List[str]:
+    """
+    Reads every page with PDFium (C++), which is much faster than pdfminer.
+    PDFium is not thread-safe, so pages are read one after another and only
+    one document is open at a time across all threads (_PDFIUM_LOCK).
+    """
+    page_texts: List[str] = []
+    # Hold the lock for the whole open/read/close: concurrent upload jobs
+    # calling into PDFium at the same time crash the process
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(filepath)
+        try:
+            total_pages = len(pdf)
+            for idx in range(total_pages):
+                page = pdf[idx]
+                textpage = page.get_textpage()
+                if textpage.count_chars() < MIN_PAGE_CHARS:
+                    # Blank/decorative page: skip text extraction
+                    page_texts.append("")
+                else:
+                    # PDFium uses Windows line endings; the label patterns expect "\n"
+                    page_texts.append(textpage.get_text_range().replace("\r\n", "\n"))
+                textpage.close()
+                page.close()
+                # Update progress (UI shows "Analyzing page x of y")
+                if update_progress:
+                    update_progress(idx + 1, total_pages)
+        finally:
+            pdf.close()
+    return page_texts
+
+
+# Page text extraction (fallback): pdfplumber, for files PDFium cannot parse
+def _extract_pages_pdfplumber(filepath: str, update_progress: Callable[[int, int], None] = None) -> List[str]:
+    """
+    Reads every page with pdfplumber across a thread pool.
+    executor.map() keeps the results in page order.
+    """
+    with pdfplumber.open(filepath) as pdf:
+        pages = list(pdf.pages)
+        total_pages = len(pages)
+        if total_pages == 0:
+            return []
+
+        done = 0
+        lock = threading.Lock()
+
+        def _extract_page(page) -> str:
+            nonlocal done
+            # Blank/decorative page: skip the (slow) layout + text extraction
+            text = "" if len(page.chars) < MIN_PAGE_CHARS else (page.extract_text() or "")
+            # Update progress (UI shows "Analyzing page x of y")
+            with lock:
+                done += 1
+                if update_progress:
+                    update_progress(done, total_pages)
+            return text
+
+        max_workers = min(8, os.cpu_count() or 1, total_pages)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(_extract_page, pages))
+
+
 # Main processor
 def process_pdf_strict(filepath: str, update_progress: Callable[[int, int], None] = None) -> Dict:
     """
     STEP 2: PDF processing logic
-      - Open with pdfplumber
+      - Open with PDFium (pdfplumber only if PDFium fails to parse the file)
       - Get total pages
-      - Loop EVERY page from 1..N
-      - Extract text and append to a list
+      - Extract text from EVERY page, in page order
       - Do NOT write Excel/output inside loop
     STEP 3: After loop, combine text into a single block and then extract fields
     STEP 4: Extract ONLY the requested fields. If missing, leave blank.
 
     Returns ONE complaint dictionary.
+    Results are cached by file content, so the same PDF is only parsed once.
     """
-    page_texts: List[str] = []
+    digest = _file_digest(filepath)
+    with _RESULT_CACHE_LOCK:
+        if digest in _RESULT_CACHE:
+            _RESULT_CACHE.move_to_end(digest)
+            return dict(_RESULT_CACHE[digest])
 
     # Open and read all pages
-    with pdfplumber.open(filepath) as pdf:
-        total_pages = len(pdf.pages)
-        if total_pages == 0:
-            # No content; return empty complaint dict
-            return {
-                'Complaint_ID': '',
-                'Complaint_Date_Time': '',
-                'Complainant_Name': '',
-                'Mobile_Number': '',
-                'Email': '',
-                'District': '',
-                'Police_Station': '',
-                'Type_of_Cybercrime': '',
-                'Platform_Involved': '',
-                'Amount_Lost': '',
-                'Current_Status': ''
-            }
-
-        # Loop through EVERY page and collect text
-        for idx, page in enumerate(pdf.pages, start=1):
-            text = page.extract_text() or ""
-            page_texts.append(text)
-            # Update progress (UI shows "Analyzing page x of y")
-            if update_progress:
-                update_progress(idx, total_pages)
+    try:
+        page_texts = _extract_pages_pdfium(filepath, update_progress)
+    except pdfium.PdfiumError:
+        page_texts = _extract_pages_pdfplumber(filepath, update_progress)
+
+    if not page_texts:
+        # No content; return empty complaint dict
+        return {field: '' for field in FIELD_LABELS}
 
     # STEP 3: Consolidate text AFTER reading all pages
     combined_text = "\n".join(page_texts)
 
     # STEP 4: Strict field extraction (labels vary; try multiple patterns)
-    complaint_id = _extract_after_label(combined_text, [
-        r"Acknowledgement\s*Number", r"Complaint\s*ID", r"Ack\s*No"
-    ])
-
-    complaint_date_time = _extract_after_label(combined_text, [
-        r"Complaint\s*Date\s*\/?\s*Time", r"Complaint\s*Date", r"Registration\s*Date"
-    ])
+    complaint = _extract_fields(combined_text)
+    complaint['Amount_Lost'] = _cleanup_amount(complaint['Amount_Lost'])
 
-    complainant_name = _extract_after_label(combined_text, [
-        r"Complainant\s*Name", r"Name\s*of\s*Complainant"
-    ])
-
-    mobile_number = _extract_after_label(combined_text, [
-        r"Mobile\s*Number", r"Mobile\s*No", r"Phone\s*Number"
-    ])
-
-    email = _extract_after_label(combined_text, [
-        r"Email", r"E\-?mail"
-    ])
-
-    district = _extract_after_label(combined_text, [
-        r"District"
-    ])
-
-    police_station = _extract_after_label(combined_text, [
-        r"Police\s*Station", r"PS\s*Name"
-    ])
-
-    type_of_cybercrime = _extract_after_label(combined_text, [
-        r"Type\s*of\s*Cyber\s*Crime", r"Category\s*of\s*complaint"
-    ])
-
-    platform_involved = _extract_after_label(combined_text, [
-        r"Platform\s*involved", r"Bank\/Platform", r"Platform"
-    ])
-
-    amount_lost_raw = _extract_after_label(combined_text, [
-        r"Amount\s*Lost", r"Total\s*Fraudulent\s*Amount", r"Loss\s*Amount"
-    ])
-    amount_lost = _cleanup_amount(amount_lost_raw)
-
-    current_status = _extract_after_label(combined_text, [
-        r"Status", r"Current\s*Status"
-    ])
+    with _RESULT_CACHE_LOCK:
+        _RESULT_CACHE[digest] = dict(complaint)
+        if len(_RESULT_CACHE) > _RESULT_CACHE_SIZE:
+            _RESULT_CACHE.popitem(last=False)
 
     # STEP 5: Return ONE dictionary; leave missing fields blank
-    complaint = {
-        'Complaint_ID': complaint_id,
-        'Complaint_Date_Time': complaint_date_time,
-        'Complainant_Name': complainant_name,
-        'Mobile_Number': mobile_number,
-        'Email': email,
-        'District': district,
-        'Police_Station': police_station,
-        'Type_of_Cybercrime': type_of_cybercrime,
-        'Platform_Involved': platform_involved,
-        'Amount_Lost': amount_lost,
-        'Current_Status': current_status,
-    }
-
     return complaint